@@ -7,16 +7,44 @@ Enables compounding knowledge, trend analysis, and reporting.
 
 import os
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "rss_db.db")
 
+# Common words skipped by get_trending_topics
+STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "is", "are", "was", "were", "be", "been",
+    "this", "that", "these", "those", "it", "its", "new", "how", "what",
+    "why", "when", "where", "who", "can", "will", "your", "you", "our",
+})
+_PUNCT_TABLE = str.maketrans("", "", ".,!?;:\"'()[]")
+
+# One shared connection for the whole process; writers serialize on _LOCK
+_CONN: Optional[sqlite3.Connection] = None
+_LOCK = threading.Lock()
+
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply per-connection PRAGMAs (journal_mode=WAL persists in the file)"""
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
 def init_db():
     """Initialize SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     
+    # WAL lets readers run alongside refresh_cache writes and, with
+    # synchronous=NORMAL, drops the fsync on every commit
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
     # Feeds table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS feeds (
@@ -25,14 +53,22 @@ def init_db():
             url TEXT UNIQUE,
             added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             last_fetched TIMESTAMP,
-            article_count INTEGER DEFAULT 0
+            article_count INTEGER DEFAULT 0,
+            etag TEXT,
+            last_modified TEXT
         )
     """)
     
+    # HTTP validators for conditional GETs, added to databases created before them
+    feed_columns = {row["name"] for row in cursor.execute("PRAGMA table_info(feeds)")}
+    for column in ("etag", "last_modified"):
+        if column not in feed_columns:
+            cursor.execute(f"ALTER TABLE feeds ADD COLUMN {column} TEXT")
+    
     # Articles table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS articles (
-            id TEXT,
+            id BLOB,
             title TEXT,
             link TEXT UNIQUE,
             summary TEXT,
@@ -46,6 +82,80 @@ def init_db():
         )
     """)
     
+    # Indexes for the time-window and per-source queries
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_fetched ON articles(fetched_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, published DESC)")
+    
+    # Full-text index over title/summary, kept in sync with articles by triggers
+    has_fts = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title, summary,
+            content='articles', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts(rowid, title, summary)
+            VALUES (new.rowid, new.title, new.summary);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, summary)
+            VALUES ('delete', old.rowid, old.title, old.summary);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, summary)
+            VALUES ('delete', old.rowid, old.title, old.summary);
+            INSERT INTO articles_fts(rowid, title, summary)
+            VALUES (new.rowid, new.title, new.summary);
+        END
+    """)
+    if not has_fts:
+        # Index rows stored before the FTS table existed
+        cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+    
+    # Hourly per-source/sentiment roll-up for the report aggregates, kept
+    # current by a trigger so reports never rescan the articles window
+    has_stats = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_hourly_stats'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_hourly_stats (
+            hour TEXT,
+            source TEXT,
+            sentiment TEXT,
+            count INTEGER DEFAULT 0,
+            sum_relevance REAL DEFAULT 0.0,
+            PRIMARY KEY (hour, source, sentiment)
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_stats_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO article_hourly_stats (hour, source, sentiment, count, sum_relevance)
+            VALUES (strftime('%Y-%m-%dT%H', new.fetched_at), new.source, new.sentiment,
+                    1, IFNULL(new.relevance_score, 0.0))
+            ON CONFLICT (hour, source, sentiment) DO UPDATE SET
+                count = count + 1,
+                sum_relevance = sum_relevance + excluded.sum_relevance;
+        END
+    """)
+    if not has_stats:
+        # Roll up rows stored before the stats table existed
+        cursor.execute("""
+            INSERT INTO article_hourly_stats (hour, source, sentiment, count, sum_relevance)
+            SELECT strftime('%Y-%m-%dT%H', fetched_at), source, sentiment,
+                   COUNT(*), SUM(IFNULL(relevance_score, 0.0))
+            FROM articles
+            GROUP BY 1, 2, 3
+        """)
+    
     # Feed topics/categories
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS feed_topics (
@@ -55,211 +165,255 @@ def init_db():
         )
     """)
     
-    conn.commit()
     return conn
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+def get_connection() -> sqlite3.Connection:
+    """Return the shared connection, opening it on first use"""
+    global _CONN
+    if _CONN is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        _CONN = _configure(conn)
+    return _CONN
+
+@contextmanager
+def _transaction():
+    """Run a write transaction on the shared connection"""
+    conn = get_connection()
+    with _LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+# ============ SQL ============
+# Statements are kept as constants so the shared connection's statement
+# cache (keyed on the exact SQL text) reuses the compiled form every call
+
+_ARTICLE_COLUMNS = "id, title, link, summary, published, source, fetched_at, sentiment, relevance_score"
+
+_SQL_INSERT_FEED = "INSERT OR IGNORE INTO feeds (name, url) VALUES (?, ?)"
+_SQL_FEED_ID = "SELECT id FROM feeds WHERE url = ?"
+_SQL_ALL_FEEDS = "SELECT * FROM feeds ORDER BY last_fetched DESC"
+_SQL_FEED_FETCHED = """
+    UPDATE feeds SET last_fetched = ?, article_count = article_count + 1 
+    WHERE url = ?
+"""
+_SQL_FEED_META = "SELECT etag, last_modified FROM feeds WHERE url = ?"
+_SQL_UPDATE_FEED_META = """
+    UPDATE feeds SET etag = ?, last_modified = ?, last_fetched = ?
+    WHERE url = ?
+"""
+
+_SQL_INSERT_ARTICLE = """
+    INSERT OR IGNORE INTO articles 
+    (id, title, link, summary, content, published, source, fetched_at, sentiment, relevance_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_LATEST_ARTICLES = f"""
+    SELECT DISTINCT {_ARTICLE_COLUMNS}
+    FROM articles 
+    ORDER BY fetched_at DESC LIMIT ?
+"""
+_SQL_RECENT_ARTICLES = f"""
+    SELECT DISTINCT {_ARTICLE_COLUMNS}
+    FROM articles 
+    WHERE fetched_at >= ?
+    ORDER BY relevance_score DESC, published DESC
+    LIMIT ?
+"""
+_SQL_ARTICLES_BY_SOURCE = f"""
+    SELECT DISTINCT {_ARTICLE_COLUMNS}
+    FROM articles WHERE source = ? 
+    ORDER BY published DESC LIMIT ?
+"""
+_SQL_SEARCH = """
+    SELECT a.id, a.title, a.link, a.summary, a.published, a.source, a.fetched_at, a.sentiment, a.relevance_score
+    FROM articles_fts
+    JOIN articles a ON a.rowid = articles_fts.rowid
+    WHERE articles_fts MATCH ?
+    ORDER BY bm25(articles_fts), a.published DESC
+    LIMIT ?
+"""
+_SQL_SENTIMENT_BREAKDOWN = """
+    SELECT sentiment, SUM(count) as count 
+    FROM article_hourly_stats 
+    WHERE hour >= ?
+    GROUP BY sentiment
+"""
+_SQL_TOP_SOURCES = """
+    SELECT source, SUM(count) as count, SUM(sum_relevance) / SUM(count) as avg_relevance
+    FROM article_hourly_stats 
+    WHERE hour >= ?
+    GROUP BY source
+    ORDER BY count DESC
+    LIMIT ?
+"""
+_SQL_TRENDING_TEXT = """
+    SELECT title, summary FROM articles 
+    WHERE fetched_at >= ?
+"""
+
+def _window_start(hours) -> str:
+    """Start of a look-back window in fetched_at's local-time ISO format.
+
+    Truncated to the hour so the article queries and the hourly roll-up
+    (which compares its first 13 characters) cover the same span.
+    """
+    cutoff = datetime.now() - timedelta(hours=int(hours))
+    return cutoff.replace(minute=0, second=0, microsecond=0).isoformat()
 
 # ============ FEEDS ============
 
 def add_feed(name: str, url: str) -> int:
     """Add a feed, return feed_id"""
-    conn = get_connection()
     try:
-        cursor = conn.execute("""
-            INSERT OR IGNORE INTO feeds (name, url) VALUES (?, ?)
-        """, (name, url))
-        conn.commit()
-        if cursor.lastrowid:
-            feed_id = cursor.lastrowid
-        else:
+        with _transaction() as conn:
+            cursor = conn.execute(_SQL_INSERT_FEED, (name, url))
+            # lastrowid is per-connection, so only trust it if this insert happened
+            if cursor.rowcount > 0:
+                return cursor.lastrowid
             # Already exists, get the ID
-            row = conn.execute("SELECT id FROM feeds WHERE url = ?", (url,)).fetchone()
-            feed_id = row[0] if row else None
-        conn.close()
-        return feed_id
+            row = conn.execute(_SQL_FEED_ID, (url,)).fetchone()
+            return row[0] if row else None
     except Exception as e:
-        conn.close()
         print(f"Error adding feed: {e}")
         return None
 
+def add_feeds(feeds: List[Tuple[str, str]]) -> int:
+    """Add (name, url) pairs in one transaction, return count of new feeds"""
+    if not feeds:
+        return 0
+    try:
+        with _transaction() as conn:
+            return conn.executemany(_SQL_INSERT_FEED, feeds).rowcount
+    except Exception as e:
+        print(f"Error adding feeds: {e}")
+        return 0
+
 def get_all_feeds() -> List[Dict]:
     """Get all feeds"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("SELECT * FROM feeds ORDER BY last_fetched DESC")
+    cursor = conn.execute(_SQL_ALL_FEEDS)
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def update_feed_fetched(url: str):
     """Mark feed as fetched"""
+    with _transaction() as conn:
+        conn.execute(_SQL_FEED_FETCHED, (datetime.now().isoformat(), url))
+
+def get_feed_meta(url: str) -> Dict:
+    """Get stored ETag/Last-Modified validators for a feed"""
     conn = get_connection()
-    conn.execute("""
-        UPDATE feeds SET last_fetched = ?, article_count = article_count + 1 
-        WHERE url = ?
-    """, (datetime.now().isoformat(), url))
-    conn.commit()
-    conn.close()
+    row = conn.execute(_SQL_FEED_META, (url,)).fetchone()
+    return dict(row) if row else {}
+
+def update_feed_meta(url: str, etag: Optional[str], last_modified: Optional[str]):
+    """Store the validators from a feed's latest 200 response"""
+    with _transaction() as conn:
+        conn.execute(_SQL_UPDATE_FEED_META, (etag, last_modified, datetime.now().isoformat(), url))
 
 # ============ ARTICLES ============
 
 def store_article(article: Dict) -> bool:
     """Store article in database, return True if new"""
-    conn = get_connection()
+    return store_articles([article]) > 0
+
+def store_articles(articles: List[Dict]) -> int:
+    """Store multiple articles in one transaction, return count of new ones"""
     fetched_at = datetime.now().isoformat()
+    rows = [(
+        a.get("id"),
+        a.get("title"),
+        a.get("link"),
+        a.get("summary", ""),
+        a.get("content", ""),
+        a.get("published"),
+        a.get("source"),
+        fetched_at,
+        a.get("sentiment", "neutral"),
+        a.get("relevance_score", 0.0)
+    ) for a in articles]
+    if not rows:
+        return 0
     
     try:
-        conn.execute("""
-            INSERT OR IGNORE INTO articles 
-            (id, title, link, summary, content, published, source, fetched_at, sentiment, relevance_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            article.get("id"),
-            article.get("title"),
-            article.get("link"),
-            article.get("summary", ""),
-            article.get("content", ""),
-            article.get("published"),
-            article.get("source"),
-            fetched_at,
-            article.get("sentiment", "neutral"),
-            article.get("relevance_score", 0.0)
-        ))
-        conn.commit()
-        new = conn.total_changes > 0
-        conn.close()
-        return new
+        with _transaction() as conn:
+            # rowcount counts direct inserts only; total_changes would also
+            # include the rows written by the FTS and roll-up triggers
+            return conn.executemany(_SQL_INSERT_ARTICLE, rows).rowcount
     except Exception as e:
-        conn.close()
-        print(f"Error storing article: {e}")
-        return False
-
-def store_articles(articles: List[Dict]) -> int:
-    """Store multiple articles, return count of new ones"""
-    new_count = 0
-    for article in articles:
-        if store_article(article):
-            new_count += 1
-    return new_count
+        print(f"Error storing articles: {e}")
+        return 0
 
 def get_articles(limit: int = 50, hours: int = None) -> List[Dict]:
     """Get articles, optionally filtered by hours"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
     
     if hours:
-        query = """
-            SELECT DISTINCT id, title, link, summary, published, source, fetched_at, sentiment, relevance_score
-            FROM articles 
-            WHERE fetched_at >= datetime('now', '-{} hours')
-            ORDER BY relevance_score DESC, published DESC
-            LIMIT ?
-        """.format(hours)
-        cursor = conn.execute(query, (limit,))
+        cursor = conn.execute(_SQL_RECENT_ARTICLES, (_window_start(hours), limit))
     else:
-        query = """
-            SELECT DISTINCT id, title, link, summary, published, source, fetched_at, sentiment, relevance_score
-            FROM articles 
-            ORDER BY fetched_at DESC LIMIT ?
-        """
-        cursor = conn.execute(query, (limit,))
+        cursor = conn.execute(_SQL_LATEST_ARTICLES, (limit,))
     
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def get_articles_by_source(source: str, limit: int = 20) -> List[Dict]:
     """Get articles from specific source"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("""
-        SELECT DISTINCT id, title, link, summary, published, source, fetched_at, sentiment, relevance_score
-        FROM articles WHERE source = ? 
-        ORDER BY published DESC LIMIT ?
-    """, (source, limit))
+    cursor = conn.execute(_SQL_ARTICLES_BY_SOURCE, (source, limit))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
+def _fts_phrase(query: str) -> str:
+    """Quote a user query as a single FTS5 phrase, prefix-matching the last word"""
+    return '"' + query.replace('"', '""') + '" *'
+
 def search_articles(query: str, limit: int = 20) -> List[Dict]:
-    """Search articles by title or summary"""
+    """Search articles by title or summary, best matches first"""
+    # An empty query matches everything; skip the index and return the latest
+    if not query.strip():
+        return get_articles(limit=limit)
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    search = f"%{query}%"
-    cursor = conn.execute("""
-        SELECT DISTINCT id, title, link, summary, published, source, fetched_at, sentiment, relevance_score
-        FROM articles 
-        WHERE title LIKE ? OR summary LIKE ?
-        ORDER BY relevance_score DESC, published DESC
-        LIMIT ?
-    """, (search, search, limit))
+    cursor = conn.execute(_SQL_SEARCH, (_fts_phrase(query), limit))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def get_sentiment_breakdown(hours: int = 24) -> Dict:
-    """Get sentiment distribution"""
+    """Get sentiment distribution (from the hourly roll-up)"""
     conn = get_connection()
-    cursor = conn.execute("""
-        SELECT sentiment, COUNT(*) as count 
-        FROM articles 
-        WHERE fetched_at >= datetime('now', '-{} hours')
-        GROUP BY sentiment
-    """.format(hours))
+    cursor = conn.execute(_SQL_SENTIMENT_BREAKDOWN, (_window_start(hours)[:13],))
     rows = cursor.fetchall()
-    conn.close()
     return {r[0]: r[1] for r in rows}
 
 def get_top_sources(hours: int = 24, limit: int = 10) -> List[Dict]:
-    """Get top sources by article count"""
+    """Get top sources by article count (from the hourly roll-up)"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("""
-        SELECT source, COUNT(*) as count, AVG(relevance_score) as avg_relevance
-        FROM articles 
-        WHERE fetched_at >= datetime('now', '-{} hours')
-        GROUP BY source
-        ORDER BY count DESC
-        LIMIT ?
-    """.format(hours), (limit,))
+    cursor = conn.execute(_SQL_TOP_SOURCES, (_window_start(hours)[:13], limit))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 def get_trending_topics(hours: int = 24, limit: int = 10) -> List[Dict]:
     """Extract trending topics/keywords from recent articles"""
     # Simple keyword extraction - in production, use NLP
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
     
-    # Get recent articles and extract keywords
-    cursor = conn.execute("""
-        SELECT title, summary FROM articles 
-        WHERE fetched_at >= datetime('now', '-{} hours')
-    """.format(hours))
+    # Get recent articles (an idx_articles_fetched range) and extract keywords
+    cursor = conn.execute(_SQL_TRENDING_TEXT, (_window_start(hours),))
     rows = cursor.fetchall()
-    conn.close()
     
     # Simple word frequency (skip common words)
-    stopwords = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", 
-                 "of", "with", "by", "from", "is", "are", "was", "were", "be", "been",
-                 "this", "that", "these", "those", "it", "its", "new", "how", "what",
-                 "why", "when", "where", "who", "can", "will", "your", "you", "our"}
-    
-    word_freq = {}
+    word_freq = Counter()
     for row in rows:
-        text = (row["title"] + " " + row["summary"]).lower()
-        words = text.split()
-        for w in words:
-            w = w.strip(".,!?;:\"'()[]")
-            if len(w) > 3 and w not in stopwords:
-                word_freq[w] = word_freq.get(w, 0) + 1
+        text = (row["title"] + " " + row["summary"]).lower().translate(_PUNCT_TABLE)
+        word_freq.update(w for w in text.split() if len(w) > 3 and w not in STOPWORDS)
     
-    # Sort by frequency
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [{"keyword": w, "count": c} for w, c in sorted_words[:limit]]
+    return [{"keyword": w, "count": c} for w, c in word_freq.most_common(limit)]
 
 def generate_rss_report(days: int = 7) -> str:
     """Generate RSS intelligence report"""
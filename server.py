@@ -6,11 +6,16 @@ A token-efficient RSS service designed for AI agents.
 
 import os
 import asyncio
+import calendar
 import hashlib
+import io
+import itertools
 import re
+import time
 import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+from datetime import datetime
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 import httpx
 import feedparser
@@ -19,8 +24,26 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 import json
 
+try:
+    # Optional C-backed HTML parser; falls back to regex tag stripping
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    # Optional libxml2-backed parser for OPML; falls back to xml.etree
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+try:
+    # Optional Aho-Corasick automaton; falls back to one substring scan per interest
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Local imports
-from rss_db import add_feed, store_articles
+from rss_db import add_feeds, store_articles, get_feed_meta, update_feed_meta
 
 load_dotenv()
 
@@ -39,10 +62,48 @@ DEFAULT_FEEDS = [
     {"name": "MIT Tech Review", "url": "https://www.technologyreview.com/feed/"},
 ]
 
+# Patterns and vocabularies used on every article, compiled once
+_TAG_RE = re.compile(r'<[^>]+>')
+_BARE_AMP_RE = re.compile(rb'&(?!(?:[A-Za-z][\w.-]*|#[0-9]+|#x[0-9A-Fa-f]+);)')
+
+POSITIVE_WORDS = frozenset({"up", "growth", "success", "new", "launch", "release", "improve", "best", "win"})
+NEGATIVE_WORDS = frozenset({"fail", "crash", "bug", "vulnerability", "hack", "down", "lose", "problem", "issue"})
+
+# Common English endings, so "launches", "released", "hacked" and "issues"
+# count while unrelated words sharing a prefix ("update", "download") don't
+_INFLECTION = r'(?:s|es|e|ed|d|ing|er|ers|est|ment|ments|ement|ements|ful|ure|ures|y|ies|ied)?'
+
+def _word_pattern(word: str) -> str:
+    """Regex for a vocabulary word and its inflections (release -> releas+ed, win -> winn+ing)"""
+    if word[-1] in "ey":
+        return re.escape(word[:-1]) + _INFLECTION
+    return re.escape(word) + re.escape(word[-1]) + "?" + _INFLECTION
+
+def build_sentiment_matcher(positive, negative) -> re.Pattern:
+    """One alternation over both vocabularies; group names ("p3", "n0") tag each word"""
+    groups = [f"(?P<p{i}>{_word_pattern(w)})" for i, w in enumerate(sorted(positive))]
+    groups += [f"(?P<n{i}>{_word_pattern(w)})" for i, w in enumerate(sorted(negative))]
+    return re.compile(r"\b(?:" + "|".join(groups) + r")\b")
+
+_SENTIMENT_RE = build_sentiment_matcher(POSITIVE_WORDS, NEGATIVE_WORDS)
+
+def build_interest_matcher(interests: list[str]):
+    """Compile interests into one Aho-Corasick automaton, or None without pyahocorasick"""
+    if ahocorasick is None or not any(interests):
+        return None
+    automaton = ahocorasick.Automaton()
+    for interest in interests:
+        if interest:
+            automaton.add_word(interest, interest)
+    automaton.make_automaton()
+    return automaton
+
+INTEREST_MATCHER = build_interest_matcher(INTERESTS)
+
 # In-memory cache
 @dataclass
 class Article:
-    id: str
+    id: bytes  # raw 16-byte MD5; hex-encoded at the JSON boundary
     title: str
     link: str
     summary: str
@@ -51,67 +112,103 @@ class Article:
     content: str = ""
     sentiment: str = "neutral"
     relevance_score: float = 0.0
+    published_ts: Optional[float] = None  # epoch seconds, None if the feed gave no usable date
 
 class ArticleCache:
     def __init__(self):
-        self.articles: dict[str, Article] = {}
-        self.seen_ids: set[str] = set()
+        self.articles: dict[bytes, Article] = {}
+        # Normalized title -> article; duplicates are dropped in add()
+        self._by_title_norm: dict[str, Article] = {}
+        self.seen_ids: set[bytes] = set()
+        # Feeds fetched in full by this process; only these may use conditional GETs
+        self.fetched_feeds: set[str] = set()
 
     def add(self, article: Article):
+        """Add an article, keeping only the most relevant story per title"""
+        title_norm = article.title.lower().strip()
+        existing = self._by_title_norm.get(title_norm)
+        if existing is not None:
+            if existing.relevance_score >= article.relevance_score:
+                return
+            del self.articles[existing.id]
+        self._by_title_norm[title_norm] = article
         self.articles[article.id] = article
 
     def get_all(self):
         return list(self.articles.values())
 
     def get_new(self, since_hours=24):
-        cutoff = datetime.now() - timedelta(hours=since_hours)
-        result = []
-        for a in self.articles.values():
-            try:
-                # Try multiple date formats
-                published_dt = None
-                for fmt in ["%Y-%m-%dT%H:%M:%S", "%a, %d %b %Y %H:%M:%S %z", "%Y-%m-%d %H:%M:%S"]:
-                    try:
-                        published_dt = datetime.strptime(a.published, fmt)
-                        break
-                    except:
-                        continue
-
-                if published_dt and published_dt > cutoff:
-                    result.append(a)
-            except:
-                # If date parsing fails, include it anyway
-                result.append(a)
-        return result
+        cutoff = time.time() - since_hours * 3600
+        # Articles without a usable date are included anyway
+        return [a for a in self.articles.values()
+                if a.published_ts is None or a.published_ts > cutoff]
 
     def deduplicate(self):
         """Remove duplicate stories based on title similarity"""
-        seen_titles = set()
-        unique = []
-        for a in self.articles.values():
-            title_norm = a.title.lower().strip()
-            if title_norm not in seen_titles:
-                seen_titles.add(title_norm)
-                unique.append(a)
-        return unique
+        return list(self._by_title_norm.values())
 
 cache = ArticleCache()
 
-async def fetch_rss(url: str) -> list[dict]:
+def encode_id(article_id: bytes) -> str:
+    """Article ID as sent to MCP clients (same hex form as the old text IDs)"""
+    return article_id.hex()
+
+def decode_id(article_id: str) -> Optional[bytes]:
+    """Parse a client-supplied article ID, None if it is not valid hex"""
+    try:
+        return bytes.fromhex(article_id)
+    except (TypeError, ValueError):
+        return None
+
+def strip_html(html: str) -> str:
+    """Return the text of an HTML fragment with tags removed and entities decoded"""
+    if LexborHTMLParser is not None:
+        try:
+            return LexborHTMLParser(html).text()
+        except Exception:
+            pass
+    return _TAG_RE.sub('', html)
+
+# Shared HTTP client so feed fetches reuse connections and can run concurrently
+http_client = httpx.AsyncClient(timeout=10, limits=httpx.Limits(max_connections=20))
+
+async def fetch_rss(client: httpx.AsyncClient, url: str) -> list[dict]:
     """Fetch and parse RSS feed"""
     try:
-        response = httpx.get(url, timeout=10)
+        # A 304 only means something if we still hold the feed's articles,
+        # so skip the validators until this process has fetched it once
+        headers = {}
+        if url in cache.fetched_feeds:
+            meta = get_feed_meta(url)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304:
+            return []
         response.raise_for_status()
-        feed = feedparser.parse(response.text)
+        # feedparser is CPU-bound; parse in a worker thread so other fetches keep going
+        # Raw bytes plus headers let feedparser detect the charset itself
+        feed = await asyncio.to_thread(feedparser.parse, response.content,
+                                       response_headers=dict(response.headers))
 
         articles = []
         for entry in feed.entries[:10]:  # Limit to 10 per feed
             # Generate ID from URL or title
-            entry_id = hashlib.md5(entry.link.encode()).hexdigest() if hasattr(entry, 'link') else hashlib.md5(entry.title.encode()).hexdigest()
+            entry_id = hashlib.md5(entry.link.encode()).digest() if hasattr(entry, 'link') else hashlib.md5(entry.title.encode()).digest()
 
             summary = entry.get("summary", entry.get("description", ""))
             # Clean HTML
-            summary = re.sub(r'<[^>]+>', '', summary)[:200]
+            summary = strip_html(summary)[:200]
+
+            # feedparser already normalizes dates to a UTC struct_time
+            if "published" in entry:
+                parsed = entry.get("published_parsed")
+                published_ts = calendar.timegm(parsed) if parsed else None
+            else:
+                published_ts = time.time()
 
             article = {
                 "id": entry_id,
@@ -119,11 +216,14 @@ async def fetch_rss(url: str) -> list[dict]:
                 "link": entry.link,
                 "summary": summary,
                 "published": entry.get("published", datetime.now().isoformat()),
+                "published_ts": published_ts,
                 "source": feed.feed.get("title", "Unknown"),
                 "content": entry.get("content", [{"value": ""}])[0].value if entry.get("content") else ""
             }
             articles.append(article)
 
+        update_feed_meta(url, response.headers.get("etag"), response.headers.get("last-modified"))
+        cache.fetched_feeds.add(url)
         return articles
     except Exception as e:
         print(f"Error fetching {url}: {e}")
@@ -132,20 +232,19 @@ async def fetch_rss(url: str) -> list[dict]:
 def calculate_relevance(title: str, summary: str) -> float:
     """Calculate relevance score based on interests"""
     text = f"{title} {summary}".lower()
-    score = 0.0
-    for interest in INTERESTS:
-        if interest.lower() in text:
-            score += 1.0
+    if INTEREST_MATCHER is not None:
+        # One pass over the text finds every interest; count each only once
+        score = float(len({interest for _, interest in INTEREST_MATCHER.iter(text)}))
+    else:
+        score = float(sum(1 for interest in INTERESTS if interest in text))
     return min(score / len(INTERESTS), 1.0)
 
 def extract_sentiment(title: str, summary: str) -> str:
     """Simple sentiment analysis"""
-    text = f"{title} {summary}".lower()
-    positive = ["up", "growth", "success", "new", "launch", "release", "improve", "best", "win"]
-    negative = ["fail", "crash", "bug", "vulnerability", "hack", "down", "lose", "problem", "issue"]
-
-    pos_count = sum(1 for p in positive if p in text)
-    neg_count = sum(1 for n in negative if n in text)
+    # Each vocabulary word counts once however often it appears, as before
+    hits = {m.lastgroup for m in _SENTIMENT_RE.finditer(f"{title} {summary}".lower())}
+    pos_count = sum(1 for h in hits if h[0] == "p")
+    neg_count = len(hits) - pos_count
 
     if pos_count > neg_count:
         return "bullish"
@@ -166,33 +265,41 @@ def extract_tldr(article: dict) -> str:
 
     return tldr
 
+# ((path, mtime_ns), feeds) from the last successful OPML parse
+_opml_cache: Optional[tuple[tuple[str, int], list[dict]]] = None
+
 def parse_opml_feeds(opml_path: str) -> list[dict]:
-    """Parse OPML file and return list of feeds"""
+    """Parse OPML file and return list of feeds (cached until the file changes)"""
+    global _opml_cache
     feeds = []
     try:
-        # Read file and remove comments
-        with open(opml_path, 'r') as f:
-            content = f.read()
-
-        # Handle unescaped & in URLs by replacing & with &amp; outside of tags
-        # First, find all xmlUrl attributes and escape their & properly
-        content = re.sub(r'(xmlUrl="[^"]*)&(.*?")', r'\1&amp;\2', content)
-
-        # Remove XML comments
-        content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
-        # Remove processing instructions
-        content = re.sub(r'<\?.*?\?>', '', content)
-
-        root = ET.fromstring(content)
-        for outline in root.findall(".//outline"):
+        cache_key = (opml_path, os.stat(opml_path).st_mtime_ns)
+        if _opml_cache is not None and _opml_cache[0] == cache_key:
+            return _opml_cache[1]
+
+        with open(opml_path, 'rb') as f:
+            # Exported OPML often has unescaped & in URLs; escape them so the
+            # parser keeps the full query string instead of rejecting the file
+            content = _BARE_AMP_RE.sub(b'&amp;', f.read())
+
+        # Stream the outlines rather than building the whole tree
+        if lxml_etree is not None:
+            events = lxml_etree.iterparse(io.BytesIO(content), tag="outline", recover=True, huge_tree=True)
+        else:
+            events = ET.iterparse(io.BytesIO(content))
+
+        for _, outline in events:
+            if outline.tag != "outline":
+                continue
             xml_url = outline.get("xmlUrl")
             if xml_url:
-                # Unescape the &amp; back to & for the URL
-                xml_url = xml_url.replace('&amp;', '&')
                 feeds.append({
                     "name": outline.get("text", outline.get("title", "Unknown")),
                     "url": xml_url,
                 })
+            outline.clear()
+
+        _opml_cache = (cache_key, feeds)
     except Exception as e:
         print(f"Error parsing OPML: {e}")
         # Fallback feeds
@@ -205,7 +312,7 @@ def parse_opml_feeds(opml_path: str) -> list[dict]:
 async def get_feeds_from_rssdeck() -> list[dict]:
     """Get feeds from RSSdeck live API (GET /api/deck/feeds/opml), returns list of {name, url}"""
     try:
-        response = httpx.get(f"{RSSDECK_URL}/api/deck/feeds/opml", timeout=5)
+        response = await http_client.get(f"{RSSDECK_URL}/api/deck/feeds/opml", timeout=5)
         response.raise_for_status()
         root = ET.fromstring(response.text)
         feeds = []
@@ -230,28 +337,35 @@ async def refresh_cache():
         feed_list = parse_opml_feeds(RSSDECK_OPML)
 
     # Track feeds in database
-    for feed in feed_list:
-        add_feed(feed["name"], feed["url"])
+    add_feeds([(feed["name"], feed["url"]) for feed in feed_list])
 
-    for feed in feed_list:
-        articles = await fetch_rss(feed["url"])
+    # Fetch all feeds concurrently
+    results = await asyncio.gather(*(fetch_rss(http_client, feed["url"]) for feed in feed_list))
 
-        # Store in database
-        store_articles(articles)
+    for articles in results:
+        # Score only entries this process has not seen on an earlier refresh
+        new_articles = [a for a in articles if a["id"] not in cache.seen_ids]
+        for a in new_articles:
+            a["relevance_score"] = calculate_relevance(a["title"], a["summary"])
+            a["sentiment"] = extract_sentiment(a["title"], a["summary"])
+            cache.seen_ids.add(a["id"])
 
-        for a in articles:
             article = Article(
                 id=a["id"],
                 title=a["title"],
                 link=a["link"],
                 summary=a["summary"],
                 published=a["published"],
+                published_ts=a["published_ts"],
                 source=a["source"],
-                relevance_score=calculate_relevance(a["title"], a["summary"]),
-                sentiment=extract_sentiment(a["title"], a["summary"])
+                relevance_score=a["relevance_score"],
+                sentiment=a["sentiment"]
             )
             cache.add(article)
 
+        # Store in database, scores included
+        store_articles(new_articles)
+
 # MCP Server setup
 app = Server("rssdeck-v2")
 
@@ -320,12 +434,9 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         interest_filter = arguments.get("interest_filter", "")
         max_results = arguments.get("max_results", 10)
 
-        # Get new articles
+        # Get new articles (the cache is already deduplicated by title)
         articles = cache.get_new(hours)
 
-        # Deduplicate
-        articles = cache.deduplicate()
-
         # Filter by interest
         if interest_filter:
             articles = [a for a in articles if interest_filter.lower() in f"{a.title} {a.summary}".lower()]
@@ -339,7 +450,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         results = []
         for a in articles:
             results.append({
-                "id": a.id,
+                "id": encode_id(a.id),
                 "title": a.title,
                 "source": a.source,
                 "published": a.published,
@@ -359,18 +470,22 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         query = arguments.get("query", "").lower()
         max_results = arguments.get("max_results", 5)
 
-        results = []
-        for a in cache.get_all():
-            if query in a.title.lower() or query in a.summary.lower():
-                results.append({
-                    "id": a.id,
-                    "title": a.title,
-                    "source": a.source,
-                    "tldr": extract_tldr({"title": a.title, "summary": a.summary}),
-                    "url": a.link
-                })
+        # An empty query matches everything, so skip the per-article scan
+        articles = cache.get_all()
+        if query:
+            articles = (a for a in articles if query in a.title.lower() or query in a.summary.lower())
 
-        results = results[:max_results]
+        # Stop at max_results so TL;DRs are only built for returned articles;
+        # islice rejects negative stops, so clamp at zero
+        results = []
+        for a in itertools.islice(articles, max(0, int(max_results))):
+            results.append({
+                "id": encode_id(a.id),
+                "title": a.title,
+                "source": a.source,
+                "tldr": extract_tldr({"title": a.title, "summary": a.summary}),
+                "url": a.link
+            })
 
         return [TextContent(type="text", text=json.dumps({
             "query": query,
@@ -379,14 +494,14 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         }))]
 
     elif name == "get_summary":
-        article_id = arguments.get("article_id", "")
+        article_id = decode_id(arguments.get("article_id", ""))
         article = cache.articles.get(article_id)
 
         if not article:
             return [TextContent(type="text", text=json.dumps({"error": "Article not found"}))]
 
         return [TextContent(type="text", text=json.dumps({
-            "id": article.id,
+            "id": encode_id(article.id),
             "title": article.title,
             "source": article.source,
             "published": article.published,
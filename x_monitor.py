@@ -14,18 +14,53 @@ Usage:
   - Or import and call functions directly
 """
 
+import argparse
+import asyncio
+import atexit
 import json
 import os
+import random
+import re
 import sqlite3
+import threading
+import time
 import urllib.request
 import urllib.error
-from datetime import datetime
-from typing import List, Optional, Dict
+from urllib.parse import urlsplit
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Tuple, Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 
+import httpx
+
+try:
+    # Optional C JSON parser; stdlib json.loads also takes bytes, just slower
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    # Optional streaming parser for large responses (embedded media arrays)
+    import ijson
+except ImportError:
+    ijson = None
+
 DB_PATH = os.path.join(os.path.dirname(__file__), "x_monitor.db")
+# Fetches older than RETENTION_DAYS move here, keeping the live tweets table small
+ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), "x_monitor_archive.db")
+RETENTION_DAYS = 30
+BACKFILL_PATH = os.path.join(os.path.dirname(__file__), "x_urls.txt")
 
-@dataclass
+# One shared connection for the whole process; writers serialize on _LOCK
+_CONN: Optional[sqlite3.Connection] = None
+_LOCK = threading.Lock()
+# Schema is created on first database use rather than at import
+_db_initialized = False
+# The archive database is attached on first use (see _attach_archive)
+_archive_attached = False
+
+@dataclass(slots=True, frozen=True)
 class Tweet:
     id: str
     author: str
@@ -36,7 +71,36 @@ class Tweet:
     retweets: int
     views: int
     url: str
-    fetched_at: str = None
+    fetched_at: Optional[str] = None  # set only on copies read back from the database
+
+# Handle and numeric ID from a status URL path; query strings and trailing
+# slashes are already split off by urlsplit
+_STATUS_PATH_RE = re.compile(r"/([^/]+)/status/(\d+)")
+# Hosts whose status URLs FxTwitter can resolve ("www." and "mobile." are stripped)
+_TWEET_HOSTS = frozenset({"x.com", "twitter.com"})
+
+# Responses declaring a larger Content-Length are parsed with ijson (when
+# installed) straight off the connection instead of being read whole; only
+# the fields _parse_tweet reads are kept
+STREAM_THRESHOLD = 64 * 1024
+_STREAM_FIELDS = {
+    "code": ("code",),
+    "message": ("message",),
+    "tweet.id": ("tweet", "id"),
+    "tweet.text": ("tweet", "text"),
+    "tweet.created_at": ("tweet", "created_at"),
+    "tweet.like_count": ("tweet", "like_count"),
+    "tweet.retweet_count": ("tweet", "retweet_count"),
+    "tweet.views.count": ("tweet", "views", "count"),
+    "tweet.author.name": ("tweet", "author", "name"),
+    "tweet.author.screen_name": ("tweet", "author", "screen_name"),
+}
+
+# Tweets fetched within this many seconds are served from the database
+FRESHNESS_TTL = 600
+
+# Async fetches retry 429/5xx responses this many times with exponential backoff
+MAX_RETRIES = 5
 
 # URLs to monitor (add any X URLs here)
 MONITOR_URLS = [
@@ -44,11 +108,44 @@ MONITOR_URLS = [
     "https://x.com/simonwillison/status/1896861234567890",
 ]
 
-def init_db():
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply per-connection PRAGMAs (journal_mode=WAL persists in the file)"""
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    return conn
+
+def _close_connection():
+    """Close the shared connection at exit, letting SQLite refresh planner stats first"""
+    global _CONN, _archive_attached
+    if _CONN is not None:
+        _CONN.execute("PRAGMA optimize")
+        _CONN.close()
+        _CONN = None
+        _archive_attached = False
+
+def init_db() -> sqlite3.Connection:
     """Initialize SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
+    global _db_initialized
+    conn = _open_connection()
+    # Under the lock, and flagged only once the schema exists, so no thread
+    # can skip init and query missing tables, and a failed init is retried
+    with _LOCK:
+        _create_schema(conn)
+        _db_initialized = True
+    return conn
+
+def _create_schema(conn: sqlite3.Connection):
+    """Create tables, indexes and triggers (all idempotent)"""
     cursor = conn.cursor()
     
+    # WAL keeps report reads from blocking on tweet inserts and, with
+    # synchronous=NORMAL, drops the fsync on every commit
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
     # Accounts table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS accounts (
@@ -60,8 +157,64 @@ def init_db():
     """)
     
     # Tweets table - stores each fetch with timestamp
+    _create_tweets_table(cursor, "main")
+    
+    # Daily engagement roll-up per tweet, kept current by a trigger so trend
+    # queries sum a few buckets instead of averaging every fetch
+    has_daily = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tweet_daily'"
+    ).fetchone()
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tweets (
+        CREATE TABLE IF NOT EXISTS tweet_daily (
+            handle TEXT,
+            day TEXT,
+            id TEXT,
+            sum_likes INTEGER DEFAULT 0,
+            sum_retweets INTEGER DEFAULT 0,
+            sum_views INTEGER DEFAULT 0,
+            n INTEGER DEFAULT 0,
+            PRIMARY KEY (handle, day, id)
+        )
+    """)
+    # The primary key serves per-handle trends; this serves the all-handles window
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tweet_daily_day_handle
+        ON tweet_daily(day, handle)
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tweets_daily_ai AFTER INSERT ON tweets BEGIN
+            INSERT INTO tweet_daily (handle, day, id, sum_likes, sum_retweets, sum_views, n)
+            VALUES (new.handle, date(new.fetched_at), new.id,
+                    IFNULL(new.likes, 0), IFNULL(new.retweets, 0), IFNULL(new.views, 0), 1)
+            ON CONFLICT (handle, day, id) DO UPDATE SET
+                sum_likes = sum_likes + excluded.sum_likes,
+                sum_retweets = sum_retweets + excluded.sum_retweets,
+                sum_views = sum_views + excluded.sum_views,
+                n = n + 1;
+        END
+    """)
+    if not has_daily:
+        # Roll up fetches stored before the roll-up table existed
+        cursor.execute("""
+            INSERT INTO tweet_daily (handle, day, id, sum_likes, sum_retweets, sum_views, n)
+            SELECT handle, date(fetched_at), id,
+                   SUM(IFNULL(likes, 0)), SUM(IFNULL(retweets, 0)), SUM(IFNULL(views, 0)), COUNT(*)
+            FROM tweets
+            GROUP BY 1, 2, 3
+        """)
+    
+    # Monitored URLs
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monitored_urls (
+            url TEXT PRIMARY KEY,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def _create_tweets_table(cursor: sqlite3.Cursor, schema: str):
+    """Create the tweets table and its index in main or the attached archive"""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.tweets (
             id TEXT,
             url TEXT,
             handle TEXT,
@@ -76,165 +229,457 @@ def init_db():
         )
     """)
     
-    # Monitored URLs
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS monitored_urls (
-            url TEXT PRIMARY KEY,
-            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+    # The (id, fetched_at) primary key already indexes the latest-fetch
+    # lookup per tweet; this one covers the same lookup within a handle
+    cursor.execute(f"""
+        CREATE INDEX IF NOT EXISTS {schema}.idx_tweets_handle_id_fetched
+        ON tweets(handle, id, fetched_at)
     """)
+
+def _attach_archive(create: bool = False) -> bool:
+    """Attach the archive database as arch, returning whether it is available.
     
-    conn.commit()
+    The archive is only created when create is set (by archive_old_tweets),
+    so databases that never archive don't grow a second file.
+    """
+    global _archive_attached
+    if _archive_attached:
+        return True
+    if not create and not os.path.exists(ARCHIVE_PATH):
+        return False
+    conn = get_connection()
+    with _LOCK:
+        if not _archive_attached:
+            conn.execute("ATTACH DATABASE ? AS arch", (ARCHIVE_PATH,))
+            conn.execute("PRAGMA arch.journal_mode=WAL")
+            # Rows are deleted from main only after they are copied here, so
+            # the copy must be durable before that delete commits
+            conn.execute("PRAGMA arch.synchronous=FULL")
+            _create_tweets_table(conn.cursor(), "arch")
+            _archive_attached = True
+    return True
+
+def _open_connection() -> sqlite3.Connection:
+    """Open the shared connection on first use, without touching the schema"""
+    global _CONN
+    if _CONN is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        _CONN = _configure(conn)
+        atexit.register(_close_connection)
+    return _CONN
+
+def get_connection() -> sqlite3.Connection:
+    """Get the shared database connection, creating the schema on first use"""
+    conn = _open_connection()
+    _ensure_db()
     return conn
 
-def get_connection():
-    """Get database connection"""
-    return sqlite3.connect(DB_PATH)
+def _ensure_db():
+    """Create the schema the first time the database is used"""
+    if not _db_initialized:
+        init_db()
+
+@contextmanager
+def _transaction():
+    """Run a write transaction on the shared connection"""
+    conn = get_connection()
+    with _LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+@contextmanager
+def bulk_mode(conn: sqlite3.Connection):
+    """Trade durability for write speed during a one-shot backfill.
+    
+    An OS crash mid-backfill can corrupt the database, so only use this
+    for loads that can simply be rerun.
+    """
+    with _LOCK:
+        conn.execute("PRAGMA main.synchronous=OFF")
+        conn.execute("PRAGMA main.journal_mode=MEMORY")
+    try:
+        yield conn
+    finally:
+        with _LOCK:
+            conn.execute("PRAGMA main.synchronous=NORMAL")
+            conn.execute("PRAGMA main.journal_mode=WAL")
+
+def load_backfill_urls(path: str = BACKFILL_PATH) -> List[str]:
+    """URLs to backfill: one per line in path if it exists, else MONITOR_URLS"""
+    if not os.path.exists(path):
+        return list(MONITOR_URLS)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+# Statements are kept as module constants, as in rss_db, so every call on the
+# shared connection hits its statement cache with identical SQL text
+
+_TWEET_COLUMNS = """t.id, t.url, t.handle, t.author, t.content, t.created_at,
+               t.likes, t.retweets, t.views, t.fetched_at"""
+
+_SQL_UPSERT_ACCOUNT = """
+    INSERT OR REPLACE INTO accounts (handle, display_name, last_checked)
+    VALUES (?, ?, ?)
+"""
+_SQL_INSERT_URL = "INSERT OR IGNORE INTO monitored_urls (url) VALUES (?)"
+_SQL_INSERT_TWEET = """
+    INSERT OR IGNORE INTO tweets 
+    (id, url, handle, author, content, created_at, likes, retweets, views, fetched_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_TWEET_HISTORY = "SELECT * FROM main.tweets WHERE id = ? ORDER BY fetched_at DESC"
+_SQL_TWEET_HISTORY_ARCHIVED = """
+    SELECT * FROM main.tweets WHERE id = ?
+    UNION ALL
+    SELECT * FROM arch.tweets WHERE id = ?
+    ORDER BY fetched_at DESC
+"""
+_SQL_ARCHIVE_COPY = "INSERT OR IGNORE INTO arch.tweets SELECT * FROM main.tweets WHERE fetched_at < ?"
+# Only rows already present in the archive are removed from main
+_SQL_ARCHIVE_DELETE = """
+    DELETE FROM main.tweets
+    WHERE fetched_at < ?
+      AND EXISTS (
+          SELECT 1 FROM arch.tweets a
+          WHERE a.id = main.tweets.id AND a.fetched_at = main.tweets.fetched_at
+      )
+"""
+# Latest fetch of each tweet: pick (id, max fetched_at) from the index,
+# then join back for just those rows
+_SQL_LATEST = f"""
+    SELECT {_TWEET_COLUMNS}
+    FROM tweets t
+    JOIN (
+        SELECT id, MAX(fetched_at) AS max_fetched
+        FROM tweets
+        GROUP BY id
+        ORDER BY max_fetched DESC LIMIT ?
+    ) latest ON t.id = latest.id AND t.fetched_at = latest.max_fetched
+    ORDER BY t.fetched_at DESC
+"""
+_SQL_LATEST_ARCHIVED = f"""
+    WITH t AS (
+        SELECT * FROM main.tweets
+        UNION ALL
+        SELECT * FROM arch.tweets
+    )
+    SELECT {_TWEET_COLUMNS}
+    FROM t
+    JOIN (
+        SELECT id, MAX(fetched_at) AS max_fetched
+        FROM t
+        GROUP BY id
+        ORDER BY max_fetched DESC LIMIT ?
+    ) latest ON t.id = latest.id AND t.fetched_at = latest.max_fetched
+    ORDER BY t.fetched_at DESC
+"""
+_SQL_BY_HANDLE = f"""
+    SELECT {_TWEET_COLUMNS}
+    FROM tweets t
+    JOIN (
+        SELECT id, MAX(fetched_at) AS max_fetched
+        FROM tweets WHERE handle = ?
+        GROUP BY id
+        ORDER BY max_fetched DESC LIMIT ?
+    ) latest ON t.id = latest.id AND t.fetched_at = latest.max_fetched
+    ORDER BY t.fetched_at DESC
+"""
+_SQL_BY_HANDLE_ARCHIVED = f"""
+    WITH t AS (
+        SELECT * FROM main.tweets WHERE handle = ?
+        UNION ALL
+        SELECT * FROM arch.tweets WHERE handle = ?
+    )
+    SELECT {_TWEET_COLUMNS}
+    FROM t
+    JOIN (
+        SELECT id, MAX(fetched_at) AS max_fetched
+        FROM t
+        GROUP BY id
+        ORDER BY max_fetched DESC LIMIT ?
+    ) latest ON t.id = latest.id AND t.fetched_at = latest.max_fetched
+    ORDER BY t.fetched_at DESC
+"""
+_TREND_COLUMNS = """handle, 
+           SUM(sum_likes) * 1.0 / SUM(n) as avg_likes,
+           SUM(sum_retweets) * 1.0 / SUM(n) as avg_retweets,
+           SUM(sum_views) * 1.0 / SUM(n) as avg_views,
+           COUNT(DISTINCT id) as tweet_count"""
+# Separate statements so each reads only the window: the (day, handle) index
+# for all handles (pinned, since without ANALYZE stats the planner prefers
+# scanning the primary key to avoid the GROUP BY sort), the (handle, day, id)
+# primary key for one
+_SQL_TRENDS = f"""
+    SELECT {_TREND_COLUMNS}
+    FROM tweet_daily INDEXED BY idx_tweet_daily_day_handle
+    WHERE day >= date('now', ?)
+    GROUP BY handle
+"""
+_SQL_TRENDS_FOR_HANDLE = f"""
+    SELECT {_TREND_COLUMNS}
+    FROM tweet_daily 
+    WHERE handle = ? AND day >= date('now', ?)
+    GROUP BY handle
+"""
+_SQL_FRESHEST = "SELECT * FROM tweets WHERE id = ? ORDER BY fetched_at DESC LIMIT 1"
 
 def add_account(handle: str, display_name: str = None):
     """Track an account"""
-    conn = get_connection()
-    conn.execute("""
-        INSERT OR REPLACE INTO accounts (handle, display_name, last_checked)
-        VALUES (?, ?, ?)
-    """, (handle, display_name, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(_SQL_UPSERT_ACCOUNT, (handle, display_name, datetime.now().isoformat()))
 
 def add_monitored_url(url: str):
     """Add URL to monitoring list"""
-    conn = get_connection()
-    conn.execute("""
-        INSERT OR IGNORE INTO monitored_urls (url) VALUES (?)
-    """, (url,))
-    conn.commit()
-    conn.close()
+    with _transaction() as conn:
+        conn.execute(_SQL_INSERT_URL, (url,))
 
 def store_tweet(tweet: Tweet) -> bool:
-    """Store tweet in database, return True if new"""
-    conn = get_connection()
+    """Store tweet (with its account and URL) in database, return True if new"""
+    return store_tweets_bulk([tweet]) > 0
+
+def _rows_from_tweets(tweets: Iterable[Tweet], fetched_at: str) -> Iterator[Tuple]:
+    """Yield tweets table rows, so executemany never needs a materialized list"""
+    for t in tweets:
+        yield (t.id, t.url, t.handle, t.author, t.content, t.created_at,
+               t.likes, t.retweets, t.views, fetched_at)
+
+def store_tweets_bulk(tweets: List[Tweet]) -> int:
+    """Store tweets, their accounts and URLs in one transaction, return count of new tweets"""
+    if not tweets:
+        return 0
     fetched_at = datetime.now().isoformat()
     
     try:
-        conn.execute("""
-            INSERT OR IGNORE INTO tweets 
-            (id, url, handle, author, content, created_at, likes, retweets, views, fetched_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            tweet.id, tweet.url, tweet.handle, tweet.author,
-            tweet.content, tweet.created_at, tweet.likes,
-            tweet.retweets, tweet.views, fetched_at
-        ))
-        conn.commit()
-        new = conn.total_changes > 0
-        conn.close()
-        return new
+        with _transaction() as conn:
+            cursor = conn.executemany(_SQL_INSERT_TWEET, _rows_from_tweets(tweets, fetched_at))
+            new_count = cursor.rowcount
+            conn.executemany(_SQL_UPSERT_ACCOUNT, ((t.handle, t.author, fetched_at) for t in tweets))
+            conn.executemany(_SQL_INSERT_URL, ((t.url,) for t in tweets))
+            return new_count
     except Exception as e:
-        conn.close()
-        print(f"Error storing tweet: {e}")
-        return False
+        print(f"Error storing tweets: {e}")
+        return 0
+
+def _rows_to_dicts(rows: List[sqlite3.Row]) -> List[Dict]:
+    """Convert query rows to plain dicts at the public, JSON-facing boundary"""
+    return [dict(row) for row in rows]
 
 def get_tweet_history(tweet_id: str) -> List[Dict]:
-    """Get all fetched records for a tweet (for trend analysis)"""
+    """Get all fetched records for a tweet, archived ones included (for trend analysis)"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("""
-        SELECT * FROM tweets WHERE id = ? ORDER BY fetched_at DESC
-    """, (tweet_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    if _attach_archive():
+        cursor = conn.execute(_SQL_TWEET_HISTORY_ARCHIVED, (tweet_id, tweet_id))
+    else:
+        cursor = conn.execute(_SQL_TWEET_HISTORY, (tweet_id,))
+    return _rows_to_dicts(cursor.fetchall())
+
+def archive_old_tweets(retention_days: int = RETENTION_DAYS) -> int:
+    """Move fetches older than retention_days into the archive database.
+    
+    Trends keep covering archived fetches through the tweet_daily roll-up,
+    and get_tweet_history/get_tweets_by_handle read through to the archive.
+    Returns the number of rows moved.
+    """
+    _attach_archive(create=True)
+    # fetched_at is a local-time isoformat string, so compare against one
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    # Commits spanning attached WAL databases aren't atomic, so copy and
+    # commit first, then delete; OR IGNORE makes a rerun after a crash harmless
+    with _transaction() as conn:
+        conn.execute(_SQL_ARCHIVE_COPY, (cutoff,))
+    with _transaction() as conn:
+        return conn.execute(_SQL_ARCHIVE_DELETE, (cutoff,)).rowcount
+
+def _query_latest(conn: sqlite3.Connection, limit: int, archived: bool = False) -> List[sqlite3.Row]:
+    """Latest fetch of the most recently fetched tweets.
+    
+    Reads the live table alone while it holds `limit` tweets; only when it
+    falls short (and the archive is attached) does it union in arch.tweets.
+    """
+    rows = conn.execute(_SQL_LATEST, (limit,)).fetchall()
+    if archived and len(rows) < limit:
+        rows = conn.execute(_SQL_LATEST_ARCHIVED, (limit,)).fetchall()
+    return rows
 
 def get_latest_tweets(limit: int = 50) -> List[Dict]:
-    """Get most recently fetched tweets"""
+    """Get most recently fetched tweets, topped up from the archive"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("""
-        SELECT DISTINCT id, url, handle, author, content, created_at, 
-               likes, retweets, views, fetched_at
-        FROM tweets 
-        GROUP BY id 
-        ORDER BY fetched_at DESC LIMIT ?
-    """, (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    return _rows_to_dicts(_query_latest(conn, limit, _attach_archive()))
 
 def get_tweets_by_handle(handle: str, limit: int = 20) -> List[Dict]:
-    """Get tweets from specific handle"""
+    """Get tweets from specific handle, archived ones included"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.execute("""
-        SELECT DISTINCT id, url, handle, author, content, created_at,
-               likes, retweets, views, fetched_at
-        FROM tweets WHERE handle = ? 
-        GROUP BY id ORDER BY fetched_at DESC LIMIT ?
-    """, (handle, limit))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    if _attach_archive():
+        cursor = conn.execute(_SQL_BY_HANDLE_ARCHIVED, (handle, handle, limit))
+    else:
+        cursor = conn.execute(_SQL_BY_HANDLE, (handle, limit))
+    return _rows_to_dicts(cursor.fetchall())
+
+def _query_trends(conn: sqlite3.Connection, handle: Optional[str], days: int) -> List[sqlite3.Row]:
+    """Per-handle average engagement over the last `days` whole days"""
+    window = f"-{int(days)} days"
+    if handle is None:
+        return conn.execute(_SQL_TRENDS, (window,)).fetchall()
+    return conn.execute(_SQL_TRENDS_FOR_HANDLE, (handle, window)).fetchall()
 
 def get_engagement_trends(handle: str = None, days: int = 7) -> Dict:
-    """Analyze engagement trends"""
+    """Analyze engagement trends (from the daily roll-up, whole days)"""
+    return {"trends": _rows_to_dicts(_query_trends(get_connection(), handle, days)), "days": days}
+
+def _report_queries(conn: sqlite3.Connection, days: int, limit: int) -> Tuple[List[sqlite3.Row], List[sqlite3.Row]]:
+    """Trends and latest tweets read back to back from one snapshot"""
+    # Attach before taking _LOCK, which _attach_archive acquires itself
+    archived = _attach_archive()
+    with _LOCK:
+        conn.execute("BEGIN DEFERRED")
+        try:
+            return _query_trends(conn, None, days), _query_latest(conn, limit, archived)
+        finally:
+            conn.execute("COMMIT")
+
+def _parse_status_url(url: str) -> Optional[Tuple[str, str]]:
+    """Extract (handle, tweet_id) from an x.com/twitter.com status URL"""
+    parts = urlsplit(url if "//" in url else "//" + url)
+    host = (parts.hostname or "").removeprefix("www.").removeprefix("mobile.")
+    if host not in _TWEET_HOSTS:
+        return None
+    m = _STATUS_PATH_RE.match(parts.path)
+    return (m.group(1), m.group(2)) if m else None
+
+def _api_url(handle: str, tweet_id: str) -> str:
+    """FxTwitter API URL for a tweet"""
+    return f"https://api.fxtwitter.com/{handle}/status/{tweet_id}"
+
+def _should_stream(content_length: Optional[str]) -> bool:
+    """Whether a response declares a body large enough to stream through ijson"""
+    return ijson is not None and content_length is not None and \
+        content_length.isdigit() and int(content_length) > STREAM_THRESHOLD
+
+class _FieldCollector:
+    """Folds ijson (prefix, event, value) events into the dict _parse_tweet expects"""
+    
+    __slots__ = ("data", "remaining")
+    
+    def __init__(self):
+        self.data: Dict = {}
+        self.remaining = len(_STREAM_FIELDS)
+    
+    def feed(self, events) -> bool:
+        """Consume events, returning True once every wanted field has been seen"""
+        for prefix, event, value in events:
+            path = _STREAM_FIELDS.get(prefix)
+            if path is None or event in ("start_map", "end_map", "start_array", "end_array", "map_key"):
+                continue
+            node = self.data
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+            self.remaining -= 1
+            if not self.remaining:
+                return True
+        return False
+
+def _read_payload(resp) -> Dict:
+    """Decode a urlopen response, streaming large bodies from the socket"""
+    if not _should_stream(resp.headers.get("Content-Length")):
+        return json_loads(resp.read())
+    collector = _FieldCollector()
+    collector.feed(ijson.parse(resp, use_float=True))
+    return collector.data
+
+async def _read_payload_async(resp: httpx.Response) -> Dict:
+    """Decode a streamed httpx response, pushing large bodies through ijson chunk by chunk"""
+    if not _should_stream(resp.headers.get("Content-Length")):
+        return json_loads(await resp.aread())
+    collector = _FieldCollector()
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    async for chunk in resp.aiter_bytes():
+        parser.send(chunk)
+        done = collector.feed(events)
+        del events[:]
+        if done:
+            # Everything needed has arrived; skip the rest of the body
+            return collector.data
+    parser.close()
+    collector.feed(events)
+    return collector.data
+
+def _parse_tweet(data: Dict, url: str) -> Optional[Tweet]:
+    """Build a Tweet from an FxTwitter API response"""
+    if data.get("code") != 200:
+        print(f"Error: {data.get('message', 'Unknown')}")
+        return None
+    
+    tweet_data = data.get("tweet", {})
+    author_data = tweet_data.get("author", {})
+    
+    return Tweet(
+        id=str(tweet_data.get("id", "")),
+        author=author_data.get("name", ""),
+        handle=author_data.get("screen_name", ""),
+        content=tweet_data.get("text", ""),
+        created_at=tweet_data.get("created_at", ""),
+        likes=tweet_data.get("like_count", 0),
+        retweets=tweet_data.get("retweet_count", 0),
+        views=tweet_data.get("views", {}).get("count", 0) if "views" in tweet_data else 0,
+        url=url,
+    )
+
+def get_fresh_tweet(tweet_id: str, max_age: int = FRESHNESS_TTL) -> Optional[Tweet]:
+    """Return the stored copy of a tweet if it was fetched within max_age seconds"""
     conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    
-    query = """
-        SELECT handle, 
-               AVG(likes) as avg_likes,
-               AVG(retweets) as avg_retweets,
-               AVG(views) as avg_views,
-               COUNT(DISTINCT id) as tweet_count
-        FROM tweets 
-        WHERE fetched_at >= datetime('now', '-{} days')
-        {}
-        GROUP BY handle
-    """.format(days, "AND handle = ?" if handle else "")
-    
-    params = [handle] if handle else []
-    cursor = conn.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return {"trends": [dict(row) for row in rows], "days": days}
-
-def fetch_tweet(url: str, store: bool = True) -> Optional[Tweet]:
-    """Fetch a single tweet using FxTwitter API"""
+    row = conn.execute(_SQL_FRESHEST, (tweet_id,)).fetchone()
+    if not row:
+        return None
     try:
-        # Extract handle and ID from URL
-        parts = url.split("/")
-        handle = parts[-2] if len(parts) >= 2 else ""
-        tweet_id = parts[-1] if parts else ""
-        
-        api_url = f"https://api.fxtwitter.com/{handle}/status/{tweet_id}"
-        req = urllib.request.Request(api_url, headers={"User-Agent": "Mozilla/5.0"})
-        
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
-        
-        if data.get("code") != 200:
-            print(f"Error: {data.get('message', 'Unknown')}")
+        age = (datetime.now() - datetime.fromisoformat(row["fetched_at"])).total_seconds()
+    except (TypeError, ValueError):
+        return None
+    if age >= max_age:
+        return None
+    
+    return Tweet(
+        id=row["id"],
+        author=row["author"],
+        handle=row["handle"],
+        content=row["content"],
+        created_at=row["created_at"],
+        likes=row["likes"],
+        retweets=row["retweets"],
+        views=row["views"],
+        url=row["url"],
+        fetched_at=row["fetched_at"],
+    )
+
+def fetch_tweet(url: str, store: bool = True, force: bool = False) -> Optional[Tweet]:
+    """Fetch a single tweet using FxTwitter API (stored copy if fresh, unless force)"""
+    try:
+        parsed = _parse_status_url(url)
+        if not parsed:
+            print(f"Error: not a tweet URL: {url}")
             return None
         
-        tweet_data = data.get("tweet", {})
-        author_data = tweet_data.get("author", {})
+        if not force:
+            cached = get_fresh_tweet(parsed[1])
+            if cached:
+                return cached
         
-        tweet = Tweet(
-            id=str(tweet_data.get("id", "")),
-            author=author_data.get("name", ""),
-            handle=author_data.get("screen_name", ""),
-            content=tweet_data.get("text", ""),
-            created_at=tweet_data.get("created_at", ""),
-            likes=tweet_data.get("like_count", 0),
-            retweets=tweet_data.get("retweet_count", 0),
-            views=tweet_data.get("views", {}).get("count", 0) if "views" in tweet_data else 0,
-            url=url,
-        )
+        req = urllib.request.Request(_api_url(*parsed), headers={"User-Agent": "Mozilla/5.0"})
+        
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            data = _read_payload(resp)
         
-        if store:
+        tweet = _parse_tweet(data, url)
+        if tweet and store:
             store_tweet(tweet)
-            add_account(tweet.handle, tweet.author)
-            add_monitored_url(url)
         
         return tweet
         
@@ -245,72 +690,170 @@ def fetch_tweet(url: str, store: bool = True) -> Optional[Tweet]:
     
     return None
 
-def fetch_all(urls: List[str], store: bool = True) -> List[Tweet]:
-    """Fetch multiple tweets"""
-    tweets = []
-    for url in urls:
-        tweet = fetch_tweet(url, store=store)
-        if tweet:
-            tweets.append(tweet)
+def _header_delay(headers: httpx.Headers) -> Optional[float]:
+    """Seconds the server asked us to wait, from Retry-After or an exhausted X-RateLimit window"""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass  # HTTP-date form; fall back to our own backoff
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(float(headers.get("X-RateLimit-Reset", "")) - time.time(), 0.0)
+        except ValueError:
+            return None
+    return None
+
+class RateLimiter:
+    """Caps in-flight requests and pauses everyone when the server signals a limit"""
+    
+    def __init__(self, concurrency: int = 32):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._resume_at = 0.0
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self
+    
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+    
+    def update(self, headers: httpx.Headers) -> Optional[float]:
+        """Record a server-requested pause; returns its length in seconds"""
+        delay = _header_delay(headers)
+        if delay:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return delay
+
+async def fetch_tweet_async(client: httpx.AsyncClient, url: str, force: bool = False,
+                            limiter: Optional[RateLimiter] = None) -> Optional[Tweet]:
+    """Fetch a single tweet using FxTwitter API on a shared async client"""
+    try:
+        parsed = _parse_status_url(url)
+        if not parsed:
+            print(f"Error: not a tweet URL: {url}")
+            return None
+        
+        if not force:
+            cached = get_fresh_tweet(parsed[1])
+            if cached:
+                return cached
+        
+        limiter = limiter or RateLimiter(1)
+        for attempt in range(MAX_RETRIES):
+            async with limiter:
+                async with client.stream("GET", _api_url(*parsed), timeout=15) as resp:
+                    server_delay = limiter.update(resp.headers)
+                    retry = (resp.status_code == 429 or resp.status_code >= 500) and attempt < MAX_RETRIES - 1
+                    if not retry:
+                        resp.raise_for_status()
+                        return _parse_tweet(await _read_payload_async(resp), url)
+            # Back off outside the limiter so other requests keep their slots
+            await asyncio.sleep(max(2 ** attempt + random.random(), server_delay or 0))
+    except httpx.HTTPStatusError as e:
+        print(f"HTTP Error: {e.response.status_code} - {e.response.reason_phrase}")
+    except Exception as e:
+        print(f"Error: {e}")
+    
+    return None
+
+async def fetch_all_async(urls: List[str], store: bool = True, concurrency: int = 32,
+                          force: bool = False) -> List[Tweet]:
+    """Fetch multiple tweets concurrently, storing them in a single transaction"""
+    limiter = RateLimiter(concurrency)
+    # Every request goes to api.fxtwitter.com, so this is the per-host cap
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    
+    async with httpx.AsyncClient(headers={"User-Agent": "Mozilla/5.0"}, limits=limits) as client:
+        results = await asyncio.gather(
+            *(fetch_tweet_async(client, url, force=force, limiter=limiter) for url in urls)
+        )
+    
+    tweets = [t for t in results if t]
+    if store:
+        # Fresh copies served from the database carry fetched_at; don't re-store them
+        store_tweets_bulk([t for t in tweets if t.fetched_at is None])
     return tweets
 
+def fetch_all(urls: List[str], store: bool = True, force: bool = False) -> List[Tweet]:
+    """Fetch multiple tweets, storing them in a single transaction"""
+    return asyncio.run(fetch_all_async(urls, store=store, force=force))
+
 def generate_report(days: int = 7) -> str:
     """Generate intelligence report"""
-    trends = get_engagement_trends(days=days)
-    latest = get_latest_tweets(limit=20)
+    trends, latest = _report_queries(get_connection(), days, limit=20)
     
-    report = f"X Monitor Report (Last {days} days)\n"
-    report += "=" * 40 + "\n\n"
+    parts: List[str] = [f"X Monitor Report (Last {days} days)\n", "=" * 40 + "\n\n"]
     
     # Top accounts by engagement
-    if trends["trends"]:
-        report += "Top Accounts by Average Engagement:\n"
-        sorted_trends = sorted(trends["trends"], 
+    if trends:
+        parts.append("Top Accounts by Average Engagement:\n")
+        sorted_trends = sorted(trends, 
                                key=lambda x: x["avg_likes"] + x["avg_retweets"] * 2, 
                                reverse=True)
         for t in sorted_trends[:5]:
-            report += f"  @{t['handle']}: ❤️{t['avg_likes']:.0f} 🔁{t['avg_retweets']:.0f} 👁️{t['avg_views']:.0f}\n"
-        report += "\n"
+            parts.append(f"  @{t['handle']}: ❤️{t['avg_likes']:.0f} 🔁{t['avg_retweets']:.0f} 👁️{t['avg_views']:.0f}\n")
+        parts.append("\n")
     
     # Recent tweets
-    report += f"Recent Tweets ({len(latest)}):\n"
+    parts.append(f"Recent Tweets ({len(latest)}):\n")
     for t in latest[:10]:
         content = t["content"][:80] + "..." if len(t["content"]) > 80 else t["content"]
-        report += f"  @{t['handle']}: {content}\n"
-        report += f"    ❤️{t['likes']} 🔁{t['retweets']} 👁️{t['views']}\n"
+        parts.append(f"  @{t['handle']}: {content}\n    ❤️{t['likes']} 🔁{t['retweets']} 👁️{t['views']}\n")
     
-    return report
+    return "".join(parts)
 
 def summarize(tweets: List[Tweet]) -> str:
     """Generate token-efficient summary"""
     if not tweets:
         return "No tweets to summarize"
     
-    result = f"X/Twitter Monitor ({len(tweets)} tweets):\n\n"
+    parts = [f"X/Twitter Monitor ({len(tweets)} tweets):\n\n"]
     for i, t in enumerate(tweets, 1):
         content = t.content[:100] + "..." if len(t.content) > 100 else t.content
-        result += f"{i}. @{t.handle}: {content}\n"
-        result += f"   ❤️{t.likes} 🔁{t.retweets} 👁️{t.views}\n\n"
+        parts.append(f"{i}. @{t.handle}: {content}\n   ❤️{t.likes} 🔁{t.retweets} 👁️{t.views}\n\n")
     
-    return result
-
-# Initialize DB on import
-init_db()
+    return "".join(parts)
 
 # Test
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="X Account Monitor")
+    parser.add_argument("--force", action="store_true",
+                        help=f"refetch even if stored within the last {FRESHNESS_TTL}s")
+    parser.add_argument("--backfill", action="store_true",
+                        help="bulk-fetch every URL in x_urls.txt (or MONITOR_URLS) with fast, non-durable writes")
+    parser.add_argument("--archive", action="store_true",
+                        help=f"move fetches older than {RETENTION_DAYS} days to the archive database and exit")
+    args = parser.parse_args()
+    init_db()
+    
+    if args.archive:
+        print(f"Archived {archive_old_tweets()} fetches to {ARCHIVE_PATH}")
+        raise SystemExit(0)
+    
     print("=== X Account Monitor ===\n")
     print(f"Database: {DB_PATH}\n")
     
-    # Test with a known tweet
-    test_url = "https://x.com/karpathy/status/1896866532301783062"
-    print(f"Fetching: {test_url}")
-    
-    tweet = fetch_tweet(test_url, store=True)
-    if tweet:
-        print(f"\n@{tweet.handle}: {tweet.content[:150]}...")
-        print(f"Likes: {tweet.likes}, Retweets: {tweet.retweets}, Views: {tweet.views}")
-        print("\nStored in database ✓")
+    if args.backfill:
+        urls = load_backfill_urls()
+        print(f"Backfilling {len(urls)} URLs")
+        with bulk_mode(get_connection()):
+            tweets = fetch_all(urls, store=True, force=args.force)
+        print(f"Fetched {len(tweets)} tweets ✓")
+    else:
+        # Test with a known tweet
+        test_url = "https://x.com/karpathy/status/1896866532301783062"
+        print(f"Fetching: {test_url}")
+        
+        tweet = fetch_tweet(test_url, store=True, force=args.force)
+        if tweet:
+            print(f"\n@{tweet.handle}: {tweet.content[:150]}...")
+            print(f"Likes: {tweet.likes}, Retweets: {tweet.retweets}, Views: {tweet.views}")
+            print("\nStored in database ✓")
     
     print("\n" + "=" * 40)
     print("Report:")